@@ -88,6 +88,7 @@ import sys
 import yaml
 from docopt import docopt
 
+from . import _phi_cache
 from . import fitness_functions
 from . import utils
 from .serialize import serializable
@@ -204,6 +205,13 @@ def main(args):
             simulation_overrides=simulation_cli_opts))
         print('Simulating {} generations...'.format(evolution.simulation.ngen))
 
+    # Persist expensive per-state φ results alongside the output, so that
+    # networks revisited across generations (or across runs sharing an output
+    # directory) skip PyPhi entirely.
+    if any(f in ('ex', 'sp')
+           for f in evolution.experiment.fitness_function):
+        _phi_cache.enable(os.path.dirname(OUTPUT_FILE) or '.')
+
     PROFILE_FILEPATH = args['--profile']
     if PROFILE_FILEPATH:
         utils.ensure_exists(os.path.dirname(PROFILE_FILEPATH) or '.')
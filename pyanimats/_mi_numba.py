@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# _mi_numba.py
+
+"""
+Numba-accelerated kernel for the ``mi`` fitness function.
+
+This module is only imported if ``numba`` is available; see
+``fitness_functions.mi`` for the pure-NumPy fallback.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def mi_from_game(game, num_sensors, num_motors):
+    """Return the sensor-motor mutual information (in bits) of a game.
+
+    Walks the flattened game states once, packing the sensor and motor bits
+    of each state into integer indices and accumulating a contingency table,
+    then computes the mutual information from the table's nonzero entries.
+
+    Args:
+        game (np.ndarray): The animat states of a game, as a 2-D array with
+            one node-state per row.
+        num_sensors (int): The number of sensors (the first columns).
+        num_motors (int): The number of motors (the last columns).
+
+    Returns:
+        float: The mutual information between sensor and motor states.
+    """
+    num_rows, num_nodes = game.shape
+    num_sensor_states = 1 << num_sensors
+    num_motor_states = 1 << num_motors
+    # Accumulate the contingency table in a single pass over the states. Each
+    # state is packed into an integer with the most-significant bit first.
+    counts = np.zeros(num_sensor_states * num_motor_states, dtype=np.int64)
+    for row in range(num_rows):
+        sensor_idx = 0
+        for k in range(num_sensors):
+            sensor_idx = (sensor_idx << 1) | (game[row, k] & 1)
+        motor_idx = 0
+        for k in range(num_nodes - num_motors, num_nodes):
+            motor_idx = (motor_idx << 1) | (game[row, k] & 1)
+        counts[sensor_idx * num_motor_states + motor_idx] += 1
+    # Get the marginal counts of the sensor and motor states.
+    sensor_marginal = np.zeros(num_sensor_states, dtype=np.int64)
+    motor_marginal = np.zeros(num_motor_states, dtype=np.int64)
+    for i in range(num_sensor_states):
+        for j in range(num_motor_states):
+            n = counts[i * num_motor_states + j]
+            sensor_marginal[i] += n
+            motor_marginal[j] += n
+    # Calculate the mutual information (in bits):
+    #   MI = Σ_ij n_ij/N * log2(n_ij*N / (a_i*b_j)).
+    total = float(num_rows)
+    mi = 0.0
+    for i in range(num_sensor_states):
+        for j in range(num_motor_states):
+            n = counts[i * num_motor_states + j]
+            if n > 0:
+                mi += (n / total) * np.log2(
+                    n * total / (sensor_marginal[i] * motor_marginal[j]))
+    return mi
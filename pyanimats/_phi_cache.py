@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# _phi_cache.py
+
+"""
+On-disk persistence for expensive per-state φ computations.
+
+Following PyPhi's own strategy of persisting results on the filesystem,
+values are keyed by the computing function, a digest of the animat's TPM and
+connectivity matrix, and the state, so evolution runs can skip PyPhi entirely
+when a network recurs across generations (or across runs sharing an output
+directory).
+
+The store is backed by SQLite, which does its own locking: the worker
+processes used for parallel fitness evaluation (and any concurrent runs
+pointed at the same output directory) can all read and write safely. Since a
+SQLite connection must not be carried across a fork, each process lazily
+opens its own connection to the store.
+
+The store is disabled until ``enable`` is called with a directory; see
+``__main__.main``.
+"""
+
+import atexit
+import os
+import sqlite3
+
+from . import utils
+
+FILENAME = 'phi_cache.db'
+
+# Seconds to wait on a locked database before giving up.
+TIMEOUT = 30
+
+_path = None
+_conn = None
+# The process that owns `_conn`; forked children inherit the module globals,
+# so each process checks this before using (or closing) the connection.
+_pid = None
+
+
+def enable(directory):
+    """Open (or create) the persistent store in ``directory``."""
+    global _path
+    disable()
+    _path = os.path.join(utils.ensure_exists(directory), FILENAME)
+    # Open eagerly so configuration errors surface immediately.
+    _connection()
+    atexit.register(disable)
+
+
+def disable():
+    """Close the persistent store, if this process opened it."""
+    global _path, _conn, _pid
+    if _conn is not None and _pid == os.getpid():
+        _conn.close()
+    _path = None
+    _conn = None
+    _pid = None
+
+
+def enabled():
+    """Return whether the persistent store is open."""
+    return _path is not None
+
+
+def _connection():
+    """Return this process's connection to the store, opening it if needed.
+
+    A connection inherited through a fork is discarded (not closed—it still
+    belongs to the parent) and replaced with a fresh one.
+    """
+    global _conn, _pid
+    if _conn is None or _pid != os.getpid():
+        _conn = sqlite3.connect(_path, timeout=TIMEOUT)
+        _conn.execute('PRAGMA journal_mode=WAL')
+        _conn.execute('PRAGMA synchronous=NORMAL')
+        _conn.execute('CREATE TABLE IF NOT EXISTS cache '
+                      '(key TEXT PRIMARY KEY, value REAL)')
+        _conn.commit()
+        _pid = os.getpid()
+    return _conn
+
+
+def key(name, connectivity_key, state):
+    """Return the store key for a (function, connectivity, state) triple."""
+    return '{}:{}:{}'.format(name, connectivity_key.hex(),
+                             ','.join(map(str, state)))
+
+
+def get(k):
+    """Return the stored value for ``k``.
+
+    Raises:
+        KeyError: If ``k`` is not in the store.
+    """
+    row = _connection().execute(
+        'SELECT value FROM cache WHERE key = ?', (k,)).fetchone()
+    if row is None:
+        raise KeyError(k)
+    return row[0]
+
+
+def put(k, value):
+    """Store ``value`` under ``k``."""
+    with _connection() as conn:
+        conn.execute('INSERT OR REPLACE INTO cache (key, value) '
+                     'VALUES (?, ?)', (k, value))
@@ -9,8 +9,8 @@ Wraps the C++ Animat extension, providing convenience methods for accessing
 animat properties (connectivity, associated PyPhi objects, etc.).
 """
 
+import hashlib
 from collections import namedtuple
-from copy import deepcopy
 from uuid import uuid4
 
 import numpy as np
@@ -100,6 +100,8 @@ class Animat:
         self._dirty_cm = True
         self._network = False
         self._dirty_network = True
+        self._connectivity_key = False
+        self._dirty_connectivity_key = True
         # Get a random unique ID.
         self._id = uuid4()
 
@@ -132,7 +134,8 @@ class Animat:
         # from the pickled object.
         state = {k: v for k, v in self.__dict__.items()
                  if k not in ['parent', '_network', '_dirty_network', '_cm',
-                              '_dirty_cm', '_tpm', '_dirty_tpm']}
+                              '_dirty_cm', '_tpm', '_dirty_tpm',
+                              '_connectivity_key', '_dirty_connectivity_key']}
         return state
 
     def __setstate__(self, state):
@@ -143,6 +146,8 @@ class Animat:
         self._dirty_cm = True
         self._network = False
         self._dirty_network = True
+        self._connectivity_key = False
+        self._dirty_connectivity_key = True
 
     def __deepcopy__(self, memo):
         """Make an entirely new instance and copy over some attributes.
@@ -151,25 +156,21 @@ class Animat:
 
             This is not, strictly speaking, a deep copy: the ``parent`` and
             ``random`` attributes are not deeply copied; they're still just
-            references.
+            references. The derived network attributes (TPM, connectivity
+            matrix, PyPhi network) are not copied at all, since they can be
+            rebuilt from the genome on demand; the population is cloned every
+            generation, and copying a PyPhi network for every clone costs far
+            more than lazily rebuilding the few that are accessed.
         """
         copy = Animat(self._experiment, genome=self._c_animat.genome)
         copy.parent = self.parent
         copy.random = self.random
-        copy.gen = deepcopy(self.gen)
-
-        # TODO this is a kludge, fix
-        copy.fitness = deepcopy(self.fitness)
-        copy._dirty_fitness = deepcopy(self._dirty_fitness)
-        copy.raw_fitness = deepcopy(self.raw_fitness)
-        copy._correct = deepcopy(self._correct)
-        copy._incorrect = deepcopy(self._incorrect)
-        copy._tpm = deepcopy(self._tpm)
-        copy._dirty_tpm = deepcopy(self._dirty_tpm)
-        copy._cm = deepcopy(self._cm)
-        copy._dirty_cm = deepcopy(self._dirty_cm)
-        copy._network = deepcopy(self._network)
-        copy._dirty_network = deepcopy(self._dirty_network)
+        copy.gen = self.gen
+        copy.fitness = self.fitness
+        copy._dirty_fitness = self._dirty_fitness
+        copy.raw_fitness = self.raw_fitness
+        copy._correct = self._correct
+        copy._incorrect = self._incorrect
         return copy
 
     def serializable(self, compact=False, genome=True, experiment=False):
@@ -219,6 +220,20 @@ class Animat:
             self._dirty_network = False
         return self._network
 
+    @property
+    def connectivity_key(self):
+        """A hash of the animat's TPM and connectivity matrix.
+
+        Two animats with the same key implement the same network, so this can
+        be used to share memoized PyPhi results across animats.
+        """
+        if self._dirty_connectivity_key:
+            self._connectivity_key = hashlib.blake2b(
+                self.tpm.tobytes() + self.cm.tobytes(),
+                digest_size=16).digest()
+            self._dirty_connectivity_key = False
+        return self._connectivity_key
+
     @property
     def correct(self):
         """The number of correct trials in the most recently played game."""
@@ -255,6 +270,7 @@ class Animat:
         self._dirty_tpm = True
         self._dirty_cm = True
         self._dirty_network = True
+        self._dirty_connectivity_key = True
 
     def play_game(self, scrambled=False, noise_level=None):
         """Return the list of state transitions the animat goes through when
@@ -6,8 +6,11 @@
 
 import datetime
 import gzip
+import hashlib
+import multiprocessing
 import pickle
 import random
+from collections import OrderedDict
 from copy import deepcopy
 from time import perf_counter as timer
 
@@ -24,6 +27,52 @@ from .phylogeny import Phylogeny
 from .utils import rounder
 
 
+# Compression level for checkpoint files. Checkpoints are written on a timed
+# interval while evolving, so favor speed over ratio.
+COMPRESS_LEVEL = 3
+
+# Fitness function used by worker processes; constructed once per worker by
+# `_initialize_worker`.
+_worker_fitness_function = None
+
+
+def _initialize_worker(function_names, transform, ranges):
+    """Construct the fitness function in a worker process."""
+    global _worker_fitness_function
+    _worker_fitness_function = ExponentialMultiFitness(function_names,
+                                                       transform, ranges)
+
+
+def _task_seed(rng_seed, gen, genome):
+    """Return a deterministic RNG seed for evaluating one genome.
+
+    Derived from the experiment seed, the generation, and the genome bytes,
+    so the stochastic parts of an evaluation (scrambled games, noise, trial
+    shuffles) don't depend on which worker process handles which animat.
+    """
+    digest = hashlib.blake2b('{}:{}:'.format(rng_seed, gen).encode() + genome,
+                             digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def _evaluate_animat(args):
+    """Evaluate a single animat (in a worker process).
+
+    The worker's RNGs are reseeded per task—workers fork with identical RNG
+    states, so without this the draws an animat sees would depend on pool
+    scheduling, making identically-seeded runs irreproducible.
+
+    The game results are returned along with the fitness values, since the
+    worker operates on a copy of the animat.
+    """
+    animat, seed = args
+    animat.random = random.Random(seed)
+    # The C RNG takes a C int, so give it the low 31 bits of the seed.
+    c_animat.seed(seed & 0x7FFFFFFF)
+    fitness, raw_fitness = _worker_fitness_function(animat)
+    return fitness, raw_fitness, animat._correct, animat._incorrect
+
+
 class Evolution:
 
     """An evolutionary simulation."""
@@ -62,6 +111,14 @@ class Evolution:
         self.CHECK_FOR_TPM_CHANGE = any(
             f not in fitness_functions.CHEAP
             for f in self.experiment.fitness_function)
+        # If we're using an expensive fitness function, then evaluate a whole
+        # generation in parallel across worker processes (with cheap functions
+        # the pickling overhead outweighs the gain). The pool is created
+        # lazily in `run`.
+        self.PARALLELIZE = any(
+            f in fitness_functions.EXPENSIVE
+            for f in self.experiment.fitness_function)
+        self.pool = None
         # Transform the fitness function.
         self.fitness_function = ExponentialMultiFitness(
             self.experiment.fitness_function,
@@ -82,8 +139,29 @@ class Evolution:
 
     def evaluate(self, population):
         animats = [a for a in population if a._dirty_fitness]
+        # Mutation frequently leaves genomes unchanged or produces duplicates
+        # within a generation, and the phenotype is determined by the genome,
+        # so evaluate one representative of each unique genome and share the
+        # result with the rest of its group.
+        groups = OrderedDict()
         for a in animats:
-            a.fitness, a.raw_fitness = self.fitness_function(a)
+            groups.setdefault(bytes(a.genome), []).append(a)
+        representatives = [group[0] for group in groups.values()]
+        if self.pool is not None:
+            tasks = [(group[0], _task_seed(self.experiment.rng_seed,
+                                           self.generation, genome))
+                     for genome, group in groups.items()]
+            results = self.pool.map(_evaluate_animat, tasks)
+        else:
+            results = []
+            for a in representatives:
+                a.fitness, a.raw_fitness = self.fitness_function(a)
+                results.append((a.fitness, a.raw_fitness,
+                                a._correct, a._incorrect))
+        for group, result in zip(groups.values(), results):
+            for a in group:
+                a.fitness, a.raw_fitness = result[0], result[1]
+                a._correct, a._incorrect = result[2], result[3]
 
     def update_simulation(self, opts):
         self.simulation.update(opts)
@@ -96,6 +174,7 @@ class Evolution:
         # Remove unpicklable attributes.
         del state['mstats']
         del state['fitness_function']
+        del state['pool']
         # Save the population as a Phylogeny to recover lineages later.
         state['population'] = Phylogeny(state['population'],
                                         step=self.simulation.sample_interval)
@@ -115,7 +194,10 @@ class Evolution:
     def select(self, animats, k):
         """Select *k* animats from a list of animats.
 
-        Uses fitness-proportionate selection.
+        Uses fitness-proportionate selection. All ``k`` animats are sampled in
+        one weighted draw from the evolution's own RNG, which is
+        distributionally equivalent to rejection sampling but runs in the
+        ``random`` module's C implementation.
 
         Args:
             animats (Iterable): The population of animats to select from.
@@ -124,24 +206,18 @@ class Evolution:
         Returns
             list: The selected animats.
         """
-        max_fitness = max(animat.fitness for animat in animats)
-        chosen = []
-        for i in range(k):
-            done = False
-            while not done:
-                candidate = self.random.choice(animats)
-                done = self.random.random() <= (candidate.fitness /
-                                                max_fitness)
-            chosen.append(candidate)
-        return chosen
+        fits = [animat.fitness for animat in animats]
+        if sum(fits) == 0:
+            return self.random.choices(animats, k=k)
+        return self.random.choices(animats, weights=fits, k=k)
 
     def print_status(self, line, elapsed):
         """Print a status uptdate to the screen."""
         print('[Seed {}]\t{}{}'.format(self.experiment.rng_seed, line,
                                        utils.compress(elapsed)))
 
-    def record(self, population, gen):
-        if gen % self.simulation.logbook_interval == 0:
+    def record(self, population, gen, force=False):
+        if force or gen % self.simulation.logbook_interval == 0:
             record = self.mstats.compile(population)
             self.logbook.record(gen=gen, **record)
 
@@ -189,6 +265,14 @@ class Evolution:
         self.random.setstate(self.python_rng_state)
         c_animat.set_rng_state(self.c_rng_state)
 
+        # Get a pool of worker processes for parallel fitness evaluation.
+        if self.PARALLELIZE and self.pool is None:
+            self.pool = multiprocessing.Pool(
+                initializer=_initialize_worker,
+                initargs=(self.experiment.fitness_function,
+                          self.experiment.fitness_transform,
+                          self.experiment.fitness_ranges))
+
         if self.generation == 0:
             # Inject start codons.
             if self.experiment.init_start_codons:
@@ -231,19 +315,32 @@ class Evolution:
                     self.experiment.rng_seed, checkpoint_file),
                     end='', flush=True)
                 self.elapsed += timer() - last_checkpoint
-                with gzip.open(checkpoint_file, 'wb') as f:
-                    pickle.dump(self, f)
+                with gzip.open(checkpoint_file, 'wb',
+                               compresslevel=COMPRESS_LEVEL) as f:
+                    pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
                 last_checkpoint = timer()
                 print('done.')
 
         self.elapsed += timer() - last_checkpoint
 
+        # Statistics are only compiled every `logbook_interval` generations;
+        # make sure the final generation is recorded before finishing.
+        if self.generation % self.simulation.logbook_interval != 0:
+            self.record(self.population, self.generation, force=True)
+
+        # Release the worker processes.
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
         # Save final checkpoint.
         print('[Seed {}]\tSaving final checkpoint to `{}`... '.format(
             self.experiment.rng_seed, checkpoint_file),
             end='', flush=True)
-        with gzip.open(checkpoint_file, 'wb') as f:
-            pickle.dump(self, f)
+        with gzip.open(checkpoint_file, 'wb',
+                       compresslevel=COMPRESS_LEVEL) as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
         print('done.\n')
 
         return self.elapsed
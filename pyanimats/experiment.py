@@ -6,7 +6,9 @@ import os
 import pickle
 import pprint
 from copy import deepcopy
+from functools import lru_cache
 
+import numpy as np
 import pyphi
 import yaml
 from munch import Munch
@@ -114,14 +116,10 @@ def _derive_params(d):
     motor_indices = list(range(
         d['num_sensors'] + d['num_hidden'],
         d['num_sensors'] + d['num_hidden'] + d['num_motors']))
-    num_sensor_states = 2**d['num_sensors']
     num_hidden_states = 2**d['num_hidden']
-    num_motor_states = 2**d['num_motors']
-    sensor_motor_states = [
-        ((i, j), (_bitlist(i, d['num_sensors']) +
-                  _bitlist(j, d['num_motors'])))
-        for i in range(num_sensor_states) for j in range(num_motor_states)
-    ]
+    (num_sensor_states, num_motor_states, sensor_motor_states,
+     sensor_motor_state_indices) = _sm_tables(d['num_sensors'],
+                                              d['num_motors'])
     # Get sensor locations (mapping them to the sensor index).
     if d['num_sensors'] < constants.MIN_BODY_LENGTH:
         gap = constants.MIN_BODY_LENGTH - d['num_sensors']
@@ -153,6 +151,7 @@ def _derive_params(d):
         'hidden_motor_indices': hidden_indices + motor_indices,
         'sensor_motor_indices': sensor_indices + motor_indices,
         # Get their power sets.
+        'sensor_powerset': tuple(pyphi.utils.powerset(sensor_indices)),
         'hidden_powerset': tuple(pyphi.utils.powerset(hidden_indices)),
         'sensors_and_hidden_powerset': tuple(
             pyphi.utils.powerset(sensor_indices + hidden_indices)),
@@ -166,10 +165,37 @@ def _derive_params(d):
         'possible_states': [pyphi.convert.loli_index2state(i, num_nodes)
                             for i in range(2**num_nodes)],
         'sensor_motor_states': sensor_motor_states,
+        'sensor_motor_state_indices': sensor_motor_state_indices,
         'sensor_locations': sensor_locations,
     }
 
 
+@lru_cache(maxsize=8)
+def _sm_tables(num_sensors, num_motors):
+    """Return the sensor-motor state tables for the given animat dimensions.
+
+    Returns the number of sensor states, the number of motor states, an int8
+    array with one possible sensor-motor state per row (so consumers can
+    compare against game states with a single broadcasted operation), and the
+    corresponding (sensor index, motor index) pairs in the same row order.
+
+    Cached so that repeated ``Experiment`` construction with the same
+    dimensions—CLI overrides, checkpoint resumes, copies—shares one table
+    instead of rebuilding it.
+    """
+    num_sensor_states = 2**num_sensors
+    num_motor_states = 2**num_motors
+    sensor_motor_states = np.array(
+        [_bitlist(i, num_sensors) + _bitlist(j, num_motors)
+         for i in range(num_sensor_states) for j in range(num_motor_states)],
+        dtype=np.int8)
+    sensor_motor_state_indices = np.array(
+        [(i, j) for i in range(num_sensor_states)
+         for j in range(num_motor_states)], dtype=np.int64)
+    return (num_sensor_states, num_motor_states, sensor_motor_states,
+            sensor_motor_state_indices)
+
+
 def _bitlist(i, padlength):
     """Return a list of the bits of an integer, padded up to ``padlength``.
 
@@ -8,16 +8,21 @@ Fitness functions for driving animat evolution.
 
 import textwrap
 from collections import Counter, OrderedDict
-from functools import wraps
+from functools import lru_cache, wraps
 
 import numpy as np
 import pyphi
-from sklearn.metrics import mutual_info_score
 
-from . import constants
-from .utils import unique_rows
+from . import _phi_cache
+from .utils import most_common_rows, unique_rows
 from c_animat import CORRECT_CATCH, WRONG_CATCH
 
+# Use the Numba-compiled kernel for `mi` if Numba is available.
+try:
+    from ._mi_numba import mi_from_game as _mi_from_game
+except ImportError:
+    _mi_from_game = None
+
 _WRAPPER_WIDTH = 72
 _base_wrapper = textwrap.TextWrapper(width=_WRAPPER_WIDTH)
 # Metadata associated with the available fitness functions.
@@ -39,6 +44,9 @@ LaTeX_NAMES = {
 }
 MULTIVALUED = ['mat']
 CHEAP = ['nat']
+# Functions dominated by per-animat PyPhi computations; worth evaluating in
+# parallel across a generation.
+EXPENSIVE = ['ex', 'ex_wvn', 'sp', 'sp_wvn', 'bp', 'bp_wvn', 'mat']
 
 
 def _register(data_function=None):
@@ -109,9 +117,11 @@ def avg_over_visited_states(upto_attr=False, transform=False, n=None,
         def wrapper(ind, **kwargs):
             upto = getattr(ind, upto_attr) if upto_attr else False
             game = ind.play_game(scrambled=scrambled)
-            sort = n is not None
-            unique_states = unique_rows(game.animat_states, upto=upto,
-                                        sort=sort)[:n]
+            if n is not None:
+                unique_states = most_common_rows(game.animat_states, n=n,
+                                                 upto=upto)
+            else:
+                unique_states = unique_rows(game.animat_states, upto=upto)
             values = [func(ind, state, **kwargs) for state in unique_states]
             if transform:
                 values = list(map(transform, values))
@@ -120,6 +130,46 @@ def avg_over_visited_states(upto_attr=False, transform=False, n=None,
     return decorator
 
 
+def memoize_per_state(func, maxsize=2**14):
+    """Memoize a per-state function on the animat's connectivity and state.
+
+    Animats frequently share a network—e.g. a parent and child whose mutation
+    didn't change the phenotype, or separate lineages that converge on the
+    same connectivity—so results are keyed on ``Animat.connectivity_key``
+    rather than cached per instance, letting them be shared across animats
+    and across generations. If the on-disk store in ``_phi_cache`` is
+    enabled, results are also persisted there, letting them be shared across
+    runs.
+
+    The wrapped function must take an animat and a state. Calls with extra
+    keyword arguments bypass the cache.
+    """
+    current = {}
+
+    @lru_cache(maxsize=maxsize)
+    def cached(key, state):
+        if not _phi_cache.enabled():
+            return func(current['ind'], state)
+        disk_key = _phi_cache.key(func.__name__, key, state)
+        try:
+            return _phi_cache.get(disk_key)
+        except KeyError:
+            value = func(current['ind'], state)
+            _phi_cache.put(disk_key, value)
+            return value
+
+    @wraps(func)
+    def wrapper(ind, state, **kwargs):
+        if kwargs:
+            return func(ind, state, **kwargs)
+        current['ind'] = ind
+        return cached(ind.connectivity_key, tuple(state))
+
+    wrapper.cache_clear = cached.cache_clear
+    wrapper.cache_info = cached.cache_info
+    return wrapper
+
+
 def wvn_trial(world_trial, noise_trial, state_data, transform, reduce,
               upto):
     if upto:
@@ -238,19 +288,40 @@ def mi(ind, scrambled=False):
     if ind.num_motors == 0:
         return 0.0
     states = ind.play_game(scrambled=scrambled).animat_states
-    # The contingency matrix has a row for every sensor state and a column for
-    # every motor state.
-    contingency = np.zeros([ind.num_sensor_states, ind.num_motor_states])
-    # Get only the sensor and motor states.
-    sensor_motor = np.concatenate([states[:, :, :ind.num_sensors],
-                                   states[:, :, -ind.num_motors:]], axis=2)
-    # Count!
-    for idx, state in ind.sensor_motor_states:
-        contingency[idx] = (sensor_motor == state).all(axis=2).sum()
-    # Calculate mutual information in nats.
-    mi_nats = mutual_info_score(None, None, contingency=contingency)
-    # Convert from nats to bits and return.
-    return mi_nats * constants.NAT_TO_BIT_CONVERSION_FACTOR
+    # Use the compiled kernel if available: it packs, counts, and computes the
+    # mutual information in one pass with no intermediate arrays.
+    if _mi_from_game is not None:
+        game = np.ascontiguousarray(states.reshape(-1, states.shape[-1]))
+        return _mi_from_game(game, ind.num_sensors, ind.num_motors)
+    # Get only the sensor and motor states, as views—they're disjoint slices
+    # of the last axis, so there's no need to materialize a combined array.
+    sensors = states[..., :ind.num_sensors]
+    motors = states[..., -ind.num_motors:]
+    # Pack each sensor (motor) state into an integer index by interpreting it
+    # as a binary number, with the most-significant bit first (matching the
+    # convention of ``experiment._bitlist``).
+    sensor_weights = 2 ** np.arange(ind.num_sensors - 1, -1, -1)
+    motor_weights = 2 ** np.arange(ind.num_motors - 1, -1, -1)
+    sensor_idx = sensors.dot(sensor_weights)
+    motor_idx = motors.dot(motor_weights)
+    # Count the occurrences of every (sensor state, motor state) pair in a
+    # single pass. The contingency matrix has a row for every sensor state and
+    # a column for every motor state.
+    flat = (sensor_idx * ind.num_motor_states + motor_idx).ravel()
+    contingency = np.bincount(
+        flat, minlength=(ind.num_sensor_states * ind.num_motor_states)
+    ).reshape(ind.num_sensor_states, ind.num_motor_states)
+    # Calculate the mutual information (in bits) directly from the contingency
+    # matrix:
+    #   MI = Σ_ij n_ij/N * log2(n_ij*N / (a_i*b_j)),
+    # where a and b are the contingency matrix's marginals.
+    total = contingency.sum()
+    sensor_marginal = contingency.sum(axis=1)
+    motor_marginal = contingency.sum(axis=0)
+    nonzero = contingency > 0
+    joint = contingency[nonzero]
+    outer = np.outer(sensor_marginal, motor_marginal)[nonzero]
+    return float((joint / total * np.log2(joint * total / outer)).sum())
 _register()(mi)
 
 
@@ -266,18 +337,22 @@ _register(data_function=mi)(mi_wvn)
 def extrinsic_causes(ind, state):
     """Return the core causes of motors and hidden units whose purviews
     are subsets of the sensors."""
-    # TODO generate powerset once (change PyPhi to use indices in find_mice
-    # purview restriction)?
+    # The mechanism and purview powersets are fixed per experiment, so they're
+    # precomputed once as derived experiment parameters.
     subsystem = ind.as_subsystem(state)
-    mechanisms = tuple(pyphi.utils.powerset(ind.hidden_motor_indices))
-    purviews = tuple(pyphi.utils.powerset(ind.sensor_indices))
-    mice = [subsystem.core_cause(mechanism, purviews=purviews)
-            for mechanism in mechanisms]
+    mice = [subsystem.core_cause(mechanism,
+                                 purviews=ind.sensor_powerset)
+            for mechanism in ind.hidden_and_motor_powerset]
     return list(filter(lambda m: m.phi > 0, mice))
 
 
+def extrinsic_phi(ind, state):
+    """Return the sum of φ of the extrinsic core causes for a single state."""
+    return phi_sum(extrinsic_causes(ind, state))
+
+
 ex = shortcircuit_if_empty()(
-    avg_over_visited_states(transform=phi_sum)(extrinsic_causes))
+    avg_over_visited_states()(memoize_per_state(extrinsic_phi)))
 ex.__name__ = 'ex'
 ex.__doc__ = """Extrinsic cause information: Animats are evaluated based on the
     sum of φ for core causes that are “about” the sensors (the purview is a
@@ -311,9 +386,14 @@ def all_concepts(ind, state):
 # The states only need to be considered unique up to the hidden units because
 # the subsystem is always the entire network (not the main complex), so there
 # are no background conditions.
+def all_concepts_phi(ind, state):
+    """Return the sum of φ of all concepts for a single state."""
+    return phi_sum(all_concepts(ind, state))
+
+
 sp = shortcircuit_if_empty()(
-    avg_over_visited_states(transform=phi_sum,
-                            upto_attr='hidden_indices')(all_concepts))
+    avg_over_visited_states(upto_attr='hidden_indices')(
+        memoize_per_state(all_concepts_phi)))
 sp.__name__ = 'sp'
 sp.__doc__ = """Sum of φ: Animats are evaluated based on the sum of φ for all
     the concepts of the animat's hidden units, or “brain”, averaged over the
@@ -129,6 +129,60 @@ def unique_rows(array, upto=False, indices=False, counts=False, sort=False):
     return (unique,) + tuple(secondary_results)
 
 
+def most_common_rows(array, n=None, upto=False):
+    """Return the ``n`` most common rows of the last dimension of an array.
+
+    Rows are returned in descending order by frequency, with ties broken by
+    lexicographic order. Binary rows of up to 64 elements (such as animat
+    states) are packed into single integer codes, so rows are counted with a
+    histogram or a single-key sort instead of the multi-key row sort of
+    ``unique_rows``.
+
+    Args:
+        array (np.ndarray): The array to consider.
+
+    Keyword Args:
+        n (int): Return only the ``n`` most common rows. Defaults to ``None``,
+            meaning all unique rows are returned.
+        upto (tuple(int)): Consider uniqueness only up to these row elements.
+    """
+    if not isinstance(array, np.ndarray):
+        array = np.array(array)
+    if array.ndim != 2:
+        array = array.reshape(-1, array.shape[-1])
+    pruned = array[:, upto] if upto else array
+    num_columns = pruned.shape[1]
+    if num_columns <= 64 and ((pruned == 0) | (pruned == 1)).all():
+        # Pack each row into an integer code, with the most-significant bit
+        # first so that code order is lexicographic row order.
+        weights = (np.uint64(1) << np.arange(num_columns,
+                                             dtype=np.uint64))[::-1]
+        packed = pruned.astype(np.uint64).dot(weights)
+        if num_columns <= 20:
+            # Few enough possible codes: histogram them in O(N).
+            packed = packed.astype(np.intp)
+            all_counts = np.bincount(packed, minlength=1 << num_columns)
+            codes = np.flatnonzero(all_counts)
+            counts = all_counts[codes]
+            # Get the index of the first occurrence of each code. Fancy
+            # assignment writes in order, so scattering the reversed indices
+            # leaves the smallest index for each code.
+            first_idx = np.zeros(1 << num_columns, dtype=np.intp)
+            first_idx[packed[::-1]] = np.arange(len(packed) - 1, -1, -1)
+            first_idx = first_idx[codes]
+        else:
+            _, first_idx, counts = np.unique(packed, return_index=True,
+                                             return_counts=True)
+    else:
+        _, first_idx, counts = np.unique(pruned, axis=0, return_index=True,
+                                         return_counts=True)
+    order = np.argsort(-counts, kind='stable')
+    if n is not None:
+        order = order[:n]
+    # Return full rows (the first occurrence represents each unique row).
+    return array[first_idx[order]]
+
+
 def signchange(a):
     """Detects sign changes in an array. Doesn't count zero as a separate
     sign.
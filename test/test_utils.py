@@ -6,7 +6,7 @@ import pytest
 import numpy as np
 
 from conftest import p
-from pyanimats.utils import unique_rows
+from pyanimats.utils import most_common_rows, unique_rows
 
 
 @pytest.fixture()
@@ -114,3 +114,35 @@ def test_unique_rows_with_sort(a):
                        [1, 0, 0, 0, 0]])
     p(result, answer)
     assert np.array_equal(result, answer)
+
+
+def test_most_common_rows(a):
+    result = most_common_rows(a)
+    answer = np.array([
+        [1, 1, 0, 0, 0],
+        [0, 0, 1, 1, 1],
+        [1, 0, 0, 0, 1],
+        [1, 0, 0, 0, 0],
+    ])
+    p(result, answer)
+    assert np.array_equal(result, answer)
+
+
+def test_most_common_rows_with_n(a):
+    result = most_common_rows(a, n=2)
+    answer = np.array([
+        [1, 1, 0, 0, 0],
+        [0, 0, 1, 1, 1],
+    ])
+    p(result, answer)
+    assert np.array_equal(result, answer)
+
+
+def test_most_common_rows_subset_columns(a):
+    result = most_common_rows(a, upto=[0])
+    answer = np.array([
+        [1, 0, 0, 0, 0],
+        [0, 0, 1, 1, 1],
+    ])
+    p(result, answer)
+    assert np.array_equal(result, answer)